@@ -0,0 +1,26 @@
+import os
+import sys
+
+import mongomock
+import pymongo
+import pytest
+
+# app connects to MongoDB at import time; run it against an in-memory
+# stand-in, with no shared cache tier and no change stream watcher
+os.environ["MONGO_URI"] = "mongodb://localhost:27017/mtgcube"
+os.environ["CACHE_REDIS_URL"] = ""
+os.environ["CHANGE_STREAMS_ENABLED"] = "false"
+pymongo.MongoClient = mongomock.MongoClient
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app  # noqa: E402
+
+
+@pytest.fixture
+def app_module():
+    """The app module over an empty database, with empty caches"""
+    for name in app.db.list_collection_names():
+        app.db.drop_collection(name)
+    app.app_cache.clear()
+    app.card_catalog.loaded_at = None
+    return app
@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+import app
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controls time.time() as seen by the cache"""
+    now = [1000.0]
+    monkeypatch.setattr(app.time, "time", lambda: now[0])
+    return now
+
+
+def test_bounded_cache_evicts_least_recently_used():
+    size = 100
+    cache = app.BoundedCache(max_bytes=3 * (size + app.BoundedCache.ENTRY_OVERHEAD), stripes=1)
+    for key in "abc":
+        cache.set("ns", key, b"x" * size)
+    cache.get("ns", "a")  # a is now the most recently used
+    cache.set("ns", "d", b"x" * size)
+
+    assert cache.get("ns", "b") is None
+    assert [cache.get("ns", key) is not None for key in "acd"] == [True, True, True]
+    assert cache.stats()["namespaces"]["ns"]["evictions"] == 1
+
+
+def test_bounded_cache_refuses_entries_larger_than_a_stripe():
+    cache = app.BoundedCache(max_bytes=1024, stripes=4)
+    assert cache.set("ns", "big", b"x" * 1024) is False
+    assert cache.get("ns", "big") is None
+
+
+def test_bounded_cache_serves_stale_entries_within_the_grace_period(clock):
+    cache = app.BoundedCache(max_bytes=1 << 20)
+    cache.set_ttl("ns", 10, stale_while_revalidate=5)
+    cache.set("ns", "key", b"body")
+
+    clock[0] += 12
+    assert cache.get("ns", "key") is None
+    assert cache.lookup("ns", "key") == (b"body", 2)
+    clock[0] += 5
+    assert cache.lookup("ns", "key") is None
+
+
+def test_bounded_cache_invalidates_by_tag():
+    cache = app.BoundedCache(max_bytes=1 << 20)
+    cache.set("card", "1", b"one", tags=("card:1",))
+    cache.set("card", "2", b"two", tags=("card:2",))
+    cache.set("comments", "1", b"c1", tags=("card:1", "comments:1"))
+
+    assert cache.invalidate_tags({"card:1"}) == 2
+    assert cache.get("card", "1") is None
+    assert cache.get("comments", "1") is None
+    assert cache.get("card", "2") == b"two"
+
+
+def test_bounded_cache_drops_results_computed_before_an_invalidation():
+    cache = app.BoundedCache(max_bytes=1 << 20)
+    generation = cache.generation
+    cache.invalidate_tags({"card:1"})  # A write lands while the query runs
+
+    assert cache.set("card", "1", b"old", generation=generation) is False
+    assert cache.get("card", "1") is None
+
+
+def test_single_flight_runs_concurrent_calls_once():
+    flight = app.SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    def load():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    leader = threading.Thread(target=lambda: results.append(flight.do("key", load)))
+    leader.start()
+    started.wait(5)
+    followers = [
+        threading.Thread(target=lambda: results.append(flight.do("key", load)))
+        for _ in range(4)
+    ]
+    for follower in followers:
+        follower.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == ["result"] * 5
+
+
+def test_single_flight_shares_errors_and_forgets_them():
+    flight = app.SingleFlight()
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        flight.do("key", fail, window=10)
+    assert flight.do("key", lambda: "recovered", window=10) == "recovered"
+
+
+def test_single_flight_window_reuses_recent_results(clock):
+    flight = app.SingleFlight()
+    assert flight.do("key", lambda: 1, window=1) == 1
+    assert flight.do("key", lambda: 2, window=1) == 1
+    clock[0] += 2
+    assert flight.do("key", lambda: 3, window=1) == 3
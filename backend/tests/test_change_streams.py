@@ -0,0 +1,101 @@
+from bson import ObjectId
+
+
+class FakeChangeStream:
+    """Hands out canned change events the way a pymongo change stream does"""
+
+    def __init__(self, events):
+        self.events = list(events)
+        self.resume_token = None
+        self.alive = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def try_next(self):
+        if not self.events:
+            self.alive = False
+            return None
+        change = self.events.pop(0)
+        self.resume_token = change["_id"]
+        return change
+
+
+class FakeReplicaSet:
+    """Stands in for the database of a single-node replica set: watch()
+    replays the events recorded after the resume token"""
+
+    def __init__(self, database, events):
+        self.events = events
+        self.change_stream_state = database.change_stream_state
+        self.resumed_after = []
+
+    def watch(self, pipeline, resume_after=None, **kwargs):
+        self.resumed_after.append(resume_after)
+        tokens = [change["_id"] for change in self.events]
+        start = tokens.index(resume_after) + 1 if resume_after in tokens else 0
+        return FakeChangeStream(self.events[start:])
+
+
+def change_event(number, operation, collection, doc):
+    return {
+        "_id": {"_data": f"{number:04d}"},
+        "operationType": operation,
+        "ns": {"db": "mtgcube", "coll": collection},
+        "documentKey": {"_id": doc["_id"]},
+        "fullDocument": doc,
+    }
+
+
+def watch_once(app, events, monkeypatch):
+    published = []
+    monkeypatch.setattr(app, "invalidate", lambda *tags, cards=(): published.append(set(tags)))
+    replica_set = FakeReplicaSet(app.db, events)
+    watcher = app.ChangeStreamWatcher(replica_set, app.WATCHED_COLLECTIONS)
+    watcher.watch()
+    return watcher, replica_set, published
+
+
+def test_malformed_events_are_skipped_not_replayed(app_module, monkeypatch):
+    app = app_module
+    reloads = []
+    monkeypatch.setattr(app.card_catalog, "reload", lambda: reloads.append(True))
+    card_id = ObjectId()
+    events = [
+        # Written by another client without the fields the API relies on
+        change_event(1, "insert", "comments", {"_id": ObjectId(), "text": "no cardId"}),
+        change_event(2, "insert", "card_history", {"_id": ObjectId(), "timestamp": None}),
+        change_event(3, "insert", "cards", {"_id": card_id, "name": "Alpha", "colors": ["W"]}),
+    ]
+
+    watcher, replica_set, published = watch_once(app, events, monkeypatch)
+
+    assert published[:2] == [set(app.RESYNC_TAGS), set(app.RESYNC_TAGS)]
+    assert f"card:{card_id}" in published[2]
+    assert len(reloads) == 2
+    assert watcher.load_token() == {"_data": "0003"}
+
+    # Resuming starts after the last event instead of replaying the bad ones
+    published.clear()
+    watcher.watch()
+    assert replica_set.resumed_after[-1] == {"_data": "0003"}
+    assert published == []
+
+
+def test_api_writes_are_not_published_twice(app_module, monkeypatch):
+    app = app_module
+    card = {"_id": ObjectId(), "name": "Beta", "colors": []}
+    app.recent_writes.record("cards", card["_id"], card)
+    changed = {**card, "name": "Beta (edited elsewhere)"}
+    events = [
+        change_event(1, "insert", "cards", card),
+        change_event(2, "replace", "cards", changed),
+    ]
+
+    _, _, published = watch_once(app, events, monkeypatch)
+
+    assert len(published) == 1
+    assert f"card:{card['_id']}" in published[0]
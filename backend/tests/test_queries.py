@@ -0,0 +1,89 @@
+import itertools
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+import app
+
+COLORS = "WUBRG"
+
+
+def mask_colors(mask):
+    return [color for color in COLORS if mask & app.COLOR_BITS[color]]
+
+
+def expected_match(card_colors, colors, color_match):
+    """The colors filter semantics, spelled out on plain sets"""
+    card = set(card_colors)
+    regular = {c for c in colors if c not in ("colorless", "multicolor")}
+    if "colorless" in colors and not card:
+        return True
+    if "multicolor" in colors and len(card) != 1:
+        return True
+    if not regular:
+        return False
+    if color_match == "exact":
+        return card == regular
+    if color_match == "at-most":
+        return card <= regular
+    return regular <= card
+
+
+@pytest.mark.parametrize("color_match", ["includes", "exact", "at-most"])
+def test_color_filter_masks_match_the_array_semantics(color_match):
+    filters = [
+        list(combo)
+        for size in range(1, 3)
+        for combo in itertools.combinations([*COLORS, "colorless", "multicolor"], size)
+    ]
+    for colors in filters:
+        masks = app.color_filter_masks(colors, color_match)
+        for mask in app.ALL_COLOR_MASKS:
+            assert (mask in masks) == expected_match(mask_colors(mask), colors, color_match), (
+                colors, mask_colors(mask)
+            )
+
+
+def test_color_filter_masks_give_up_on_unknown_colors():
+    assert app.color_filter_masks(["W", "Purple"], "includes") is None
+
+
+def test_normalize_color_filter():
+    assert app.normalize_color_filter(["u", " w", "", "Colorless", "W"], "EXACT") == (
+        ["U", "W", "colorless"], "exact"
+    )
+
+
+@pytest.fixture
+def collection():
+    cards = mongomock.MongoClient().db.cards
+    names = ["Alpha", "Beta", "Gamma", None]
+    sets = ["Set 1", "Set 2", None]
+    for index, (name, card_set) in enumerate(itertools.product(names, sets)):
+        doc = {"_id": ObjectId(), "set": card_set, "rarity": ["Common", "Rare"][index % 2]}
+        if name is not None:
+            doc["name"] = name
+        cards.insert_one(doc)
+    return cards
+
+
+@pytest.mark.parametrize("sort_spec", [
+    [("name", 1)],
+    [("name", -1)],
+    [("set", 1), ("name", 1)],
+    [("set", -1), ("name", -1)],
+    [("set", 1), ("rarity", -1), ("name", 1)],
+])
+def test_seek_query_resumes_right_after_the_cursor(collection, sort_spec):
+    sort_spec = app.with_id_tie_breaker(sort_spec)
+    ordered = list(collection.find().sort(sort_spec))
+    for position, last in enumerate(ordered):
+        state = {"o": position + 1, "k": [last.get(f) for f, _ in sort_spec[:-1]], "id": str(last["_id"])}
+        remaining = list(collection.find(app.seek_query(sort_spec, state)).sort(sort_spec))
+        assert [doc["_id"] for doc in remaining] == [doc["_id"] for doc in ordered[position + 1:]]
+
+
+def test_seek_query_without_a_sort_key_falls_back_to_skipping():
+    assert app.seek_query([("_id", 1)], None) is None
+    assert app.seek_query([("_id", 1)], {"o": 10}) is None
@@ -0,0 +1,87 @@
+import time
+
+import fakeredis
+import pytest
+
+import app
+
+
+@pytest.fixture
+def server():
+    """One Redis stand-in shared by the simulated worker processes"""
+    return fakeredis.FakeServer()
+
+
+def worker_tier(server):
+    return app.RedisCacheTier(fakeredis.FakeRedis(server=server), prefix="test")
+
+
+def test_shared_entries_round_trip_and_invalidate_by_tag(server):
+    tier = worker_tier(server)
+    assert tier.set("card", "1", b"body", ttl=60, tags=("card:1", "card_name:alpha"))
+    assert tier.get("card", "1") == (b"body", ("card:1", "card_name:alpha"))
+
+    tier.invalidate_tags({"card_name:alpha"})
+    assert tier.get("card", "1") is None
+
+
+def test_shared_set_rejects_bodies_computed_before_a_write(server):
+    reader, writer = worker_tier(server), worker_tier(server)
+    version = reader.version()
+    writer.next_version()  # Another worker writes while the body is computed
+
+    assert reader.set("card", "1", b"old", ttl=60, tags=("card:1",), version=version) is False
+    assert reader.get("card", "1") is None
+    assert reader.stats["rejected"] == 1
+
+
+def test_publish_drops_shared_entries_before_delivering_and_announcing(server):
+    tier = worker_tier(server)
+    tier.set("card", "1", b"body", ttl=60, tags=("card:1",))
+    listener = fakeredis.FakeRedis(server=server).pubsub(ignore_subscribe_messages=True)
+    listener.subscribe(tier.channel)
+
+    seen_at_delivery = []
+    bus = app.InvalidationBus(tier)
+    bus.subscribe(lambda tags, cards: seen_at_delivery.append(
+        (tier.get("card", "1"), listener.get_message(timeout=0))
+    ))
+    bus.publish(frozenset({"card:1"}))
+
+    # Delivered locally once the shared entry was gone, and before the announcement
+    assert seen_at_delivery == [(None, None)]
+    message = app.json_util.loads(listener.get_message(timeout=1)["data"])
+    assert message["tags"] == ["card:1"] and message["origin"] == tier.origin
+
+
+def test_invalidations_reach_the_other_workers(server):
+    writer_tier, reader_tier = worker_tier(server), worker_tier(server)
+    reader_cache = app.BoundedCache(max_bytes=1 << 20)
+    reader_cache.set("card", "1", b"body", tags=("card:1",))
+    reader_bus = app.InvalidationBus()
+    reader_bus.subscribe(lambda tags, cards: reader_cache.invalidate_tags(tags))
+    reader_tier.listen(lambda message: reader_bus.deliver(frozenset(message["tags"])))
+    time.sleep(0.1)  # Let the listener subscribe
+
+    app.InvalidationBus(writer_tier).publish(frozenset({"card:1"}))
+
+    deadline = time.time() + 2
+    while reader_cache.get("card", "1") is not None and time.time() < deadline:
+        time.sleep(0.01)
+    assert reader_cache.get("card", "1") is None
+
+
+def test_fill_does_not_share_a_body_a_concurrent_write_made_stale(app_module, server, monkeypatch):
+    app = app_module
+    tier = worker_tier(server)
+    monkeypatch.setattr(app, "shared_tier", tier)
+    monkeypatch.setattr(app.invalidation_bus, "transport", tier)
+
+    def compute():
+        body = b"card as read before the write"
+        app.invalidate("card:1")  # The write lands before the body is stored
+        return body, ("card:1",)
+
+    assert app.fill_cache_entry("card", "1", compute) == b"card as read before the write"
+    assert tier.get("card", "1") is None
+    assert app.app_cache.get("card", "1") is None